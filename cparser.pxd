@@ -0,0 +1,7 @@
+cdef class Lexeme:
+    cdef public object type
+    cdef public list _chunks
+    cdef public list _runs
+
+cpdef Lexeme make_line(Py_ssize_t num, str line)
+cdef Lexeme _make_lexeme(object lexeme_type, list chunks, list runs)
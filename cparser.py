@@ -3,11 +3,18 @@ This module defines a CParser class and related components to parse C source fil
 
 It includes definitions for LexemeType, Lexeme, and helper functions to process
 lines from the source file into lexemes.
+
+The module can be compiled into a native extension with Cython (`make cython`),
+with static types for Lexeme declared in cparser.pxd. The import system prefers
+the built extension, and falls back to this source when it is not built. Edits
+to this file have no effect while a built extension is present: rebuild it
+(`make check` does this) or remove it (`make clean`).
 """
 
+import os
+import sys
 from collections import namedtuple
 from enum import Enum, auto
-from itertools import groupby
 from pathlib import Path
 
 from utils import format_ranges
@@ -18,23 +25,67 @@ class LexemeType(Enum):
     LEX_RLINE = auto()
     LEX_CLINE = auto()
 
-Loc = namedtuple('Loc', ['l', 'c'])
+# Enum attribute lookups are not free, bind the members used per line once.
+_LEX_RLINE = LexemeType.LEX_RLINE
+_LEX_CLINE = LexemeType.LEX_CLINE
+
+# Files up to this size are read at once and split, larger ones are streamed.
+BULK_READ_SIZE = 16 * 1024 * 1024
+# Number of dumped lexemes written to stdout at once.
+DUMP_BATCH_SIZE = 1024
+
+LocRun = namedtuple('LocRun', ['l', 'c0', 'n'])
 
 class Lexeme:
-    """Represents a lexical element with type, text, and loc information."""
+    """
+    Represents a lexical element with type, text, and loc information.
 
-    def __init__(self):
-        self.type = LexemeType.LEX_UNKNOWN
-        self.text = ''
-        self.locs = []
+    Locations are stored as a list of LocRun segments: each run covers `n`
+    consecutive columns starting from `c0` on the line `l`. The per-character
+    `locs` list and the text (kept as a list of non-empty chunks) are built
+    each time they are requested.
+    """
 
-    def _format_locs(self):
-        def format_lines():
-            for l, locs in groupby(self.locs, key=lambda pos: pos.l):
-                ranges = format_ranges(pos.c for pos in locs)
-                yield f"{l}:{ranges}"
+    __slots__ = ('type', '_chunks', '_runs')
+
+    def __init__(self, lexeme_type=LexemeType.LEX_UNKNOWN):
+        self.type = lexeme_type
+        self._chunks = []
+        self._runs = []
+
+    @property
+    def text(self):
+        """The text of the lexeme."""
+        return ''.join(self._chunks)
 
-        return ';'.join(format_lines())
+    @text.setter
+    def text(self, value):
+        self._chunks = [value] if value else []
+
+    @property
+    def locs(self):
+        """The list of (line, column) tuples, one per character of the lexeme."""
+        return [(run.l, run.c0 + i) for run in self._runs for i in range(run.n)]
+
+    def _format_locs(self):
+        out = []
+        runs = self._runs
+        n = len(runs)
+        i = 0
+        while i < n:
+            l, c0, count = runs[i]
+            j = i + 1
+            while j < n and runs[j].l == l:
+                j += 1
+            if j > i + 1:
+                cols = [run.c0 + k for run in runs[i:j] for k in range(run.n)]
+                out.append(f"{l}:{format_ranges(cols)}")
+            elif count == 1:
+                out.append(f"{l}:{c0}")
+            else:
+                out.append(f"{l}:{c0}-{c0 + count - 1}")
+            i = j
+        return ';'.join(out)
 
     @property
     def last_pos(self):
@@ -42,9 +93,10 @@ class Lexeme:
         Retrieves the last position from the locs list.
 
         Returns:
-            The last Loc object for the last character in a lexeme.
+            The (line, column) tuple for the last character in a lexeme.
         """
-        return self.locs[-1]
+        run = self._runs[-1]
+        return (run.l, run.c0 + run.n - 1)
 
     def append(self, lexeme):
         """
@@ -54,8 +106,17 @@ class Lexeme:
             lexeme (Lexeme): The Lexeme object whose text and locs are to be appended.
         """
 
-        self.text += lexeme.text
-        self.locs += lexeme.locs
+        chunks = lexeme._chunks  # pylint: disable=protected-access
+        if chunks:
+            self._chunks.extend(chunks)
+        runs = lexeme._runs  # pylint: disable=protected-access
+        if runs:
+            if self._runs:
+                last, first = self._runs[-1], runs[0]
+                if last.l == first.l and last.c0 + last.n == first.c0:
+                    self._runs[-1] = LocRun(last.l, last.c0, last.n + first.n)
+                    runs = runs[1:]
+            self._runs += runs
 
     def truncate(self, count=1):
         """
@@ -66,8 +127,19 @@ class Lexeme:
         """
 
         if count > 0:
-            self.text = self.text[:-count]
-            self.locs = self.locs[:-count]
+            chunks = self._chunks
+            left = count
+            while left > 0 and chunks:
+                last = chunks.pop()
+                if len(last) > left:
+                    chunks.append(last[:-left])
+                left -= len(last)
+            runs = self._runs
+            while count > 0 and runs:
+                last = runs.pop()
+                if last.n > count:
+                    runs.append(LocRun(last.l, last.c0, last.n - count))
+                count -= last.n
 
     def endswith(self, s):
         """
@@ -76,6 +148,8 @@ class Lexeme:
         Args:
             s (str): The substring to check against the end of the lexeme's text.
         """
+        if self._chunks and len(self._chunks[-1]) >= len(s):
+            return self._chunks[-1].endswith(s)
         return self.text.endswith(s)
 
     def dump(self):
@@ -94,10 +168,17 @@ def make_line(num, line):
     Returns:
         Lexeme: A Lexeme object representing the line.
     """
-    lexem = Lexeme()
+    lexem = Lexeme(_LEX_RLINE)
     lexem.text = line
-    lexem.locs = [Loc(num, c+1) for c in range(len(line))]
-    lexem.type = LexemeType.LEX_RLINE
+    if line:
+        lexem._runs = [LocRun(num, 1, len(line))]  # pylint: disable=protected-access
+    return lexem
+
+def _make_lexeme(lexeme_type, chunks, runs):
+    # pylint: disable=protected-access
+    lexem = Lexeme(lexeme_type)
+    lexem._chunks = chunks
+    lexem._runs = runs
     return lexem
 
 class CParser:
@@ -105,46 +186,52 @@ class CParser:
 
     def __init__(self):
         self.fn = None
-
-    def _read_rlines(self, f):
-        num = 1
-        for line in f.readlines():
-            if line.endswith('\n'):
+        self._dumps = []
+
+    def _flush_dumps(self):
+        if self._dumps:
+            write = sys.stdout.write
+            write('\n'.join(self._dumps))
+            write('\n')
+            self._dumps.clear()
+
+    def _read_lines(self, lines):
+        lex_cline = _LEX_CLINE
+        chunks = []
+        runs = []
+        count = 0
+        slash_pos = None
+        for num, line in enumerate(lines, 1):
+            line = line.rstrip('\n')
+            slashed = line[-1:] == '\\'
+            if not slashed and not count:
+                yield make_line(num, line)
+                continue
+
+            if slashed:
                 line = line[:-1]
-            lexem = make_line(num, line)
-            num += 1
-            yield lexem
-
-    def _read_clines(self, rlines):
-        current = None
-        while True:
-            try:
-                rline = next(rlines)
-            except StopIteration:
-                break
-
-            if current is None:
-                current = rline
-            else:
-                current.type = LexemeType.LEX_CLINE
-                current.append(rline)
-
-            if not current.endswith('\\'):
-                yield current
-                current = None
-            else:
-                current.truncate()
-
-        if current is not None:
-            self.error(current.last_pos, "Slashed end", dc=1)
-            yield current
+                slash_pos = (num, len(line))
+            if line:
+                chunks.append(line)
+                runs.append(LocRun(num, 1, len(line)))
+            count += 1
+
+            if not slashed:
+                yield _make_lexeme(lex_cline, chunks, runs)
+                chunks = []
+                runs = []
+                count = 0
+
+        if count:
+            self.error(slash_pos, "Slashed end", dc=1)
+            yield _make_lexeme(lex_cline if count > 1 else _LEX_RLINE, chunks, runs)
 
     def error(self, pos, msg, *, dl=0, dc=0):
         """
         Prints an error message with file name, line, and column information.
 
         Args:
-            pos (Position): The position object containing line and column information.
+            pos (tuple): The (line, column) position.
             msg (str): The error message to be displayed.
             dl (int, optional): The line number correction. Defaults to 0.
             dc (int, optional): The column number correction. Defaults to 0.
@@ -153,18 +240,30 @@ class CParser:
             str: A formatted error message with location.
         """
 
-        l, c = pos.l + dl, pos.c + dc
+        l, c = pos
+        l += dl
+        c += dc
+        self._flush_dumps()
         print(f'Error {self.fn}:{l}:{c} {msg}')
 
     def dump_stream(self, stream):
         """
         Prints the dump of each lexeme in the given stream.
 
+        Dumps are written in batches of DUMP_BATCH_SIZE lines. Pending dumps
+        are flushed before an error message so the output keeps its order.
+
         Args:
             stream (iterable): An iterable of Lexeme objects.
         """
-        for lexem in stream:
-            print(lexem.dump())
+        dumps = self._dumps
+        try:
+            for lexem in stream:
+                dumps.append(lexem.dump())
+                if len(dumps) >= DUMP_BATCH_SIZE:
+                    self._flush_dumps()
+        finally:
+            self._flush_dumps()
 
     def parse(self, fn):
         """
@@ -174,8 +273,13 @@ class CParser:
             fn (str or path-like object):
                 The filename or path-like object representing the C source file to parse.
         """
-        self.fn = Path(fn).absolute()
+        self.fn = str(Path(fn).absolute())
         with open(self.fn, 'r', encoding='utf-8') as f:
-            stream = self._read_rlines(f)
-            stream = self._read_clines(stream)
+            lines = f
+            if os.fstat(f.fileno()).st_size <= BULK_READ_SIZE:
+                # Not splitlines(): it also breaks lines on \f, \v and others.
+                lines = f.read().split('\n')
+                if lines[-1] == '':
+                    lines.pop()
+            stream = self._read_lines(lines)
             self.dump_stream(stream)
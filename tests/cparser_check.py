@@ -0,0 +1,140 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import unittest.mock
+import cparser
+from cparser import CParser, LocRun, make_line
+
+def read_lines(text):
+    return list(CParser()._read_lines(io.StringIO(text)))
+
+class TestLexeme(unittest.TestCase):
+    def test_make_line(self):
+        lexem = make_line(3, "int x;")
+        self.assertEqual(lexem._runs, [LocRun(3, 1, 6)])
+        self.assertEqual(lexem.locs, [(3, c) for c in range(1, 7)])
+        self.assertEqual(lexem.last_pos, (3, 6))
+
+    def test_make_empty_line(self):
+        lexem = make_line(1, "")
+        self.assertEqual(lexem.locs, [])
+        self.assertIn("locs=)", lexem.dump())
+
+    def test_truncate(self):
+        lexem = make_line(1, "abc\\")
+        lexem.truncate()
+        self.assertEqual(lexem.text, "abc")
+        self.assertEqual(lexem.last_pos, (1, 3))
+
+    def test_truncate_across_runs(self):
+        lexem = make_line(1, "ab")
+        lexem.append(make_line(2, "cd"))
+        lexem.truncate(3)
+        self.assertEqual(lexem.text, "a")
+        self.assertEqual(lexem.locs, [(1, 1)])
+
+    def test_append_merges_adjacent_runs(self):
+        lexem = make_line(1, "ab")
+        tail = make_line(1, "cd")
+        tail._runs = [LocRun(1, 3, 2)]
+        lexem.append(tail)
+        self.assertEqual(lexem._runs, [LocRun(1, 1, 4)])
+
+    def test_format_split_runs(self):
+        lexem = make_line(1, "ab")
+        tail = make_line(1, "cd")
+        tail._runs = [LocRun(1, 5, 2)]
+        lexem.append(tail)
+        self.assertEqual(lexem._format_locs(), "1:1-2, 5-6")
+
+    def test_append_text(self):
+        lexem = make_line(1, "ab")
+        lexem.append(make_line(2, ""))
+        lexem.append(make_line(3, "cd\\"))
+        self.assertTrue(lexem.endswith("\\"))
+        self.assertEqual(lexem.text, "abcd\\")
+        lexem.truncate(2)
+        self.assertEqual(lexem.text, "abc")
+        self.assertFalse(lexem.endswith("xabc"))
+
+    def test_dump(self):
+        self.assertEqual(make_line(7, "{").dump(), "Lexeme(type=LEX_RLINE, text={, locs=7:1)")
+
+class TestCParser(unittest.TestCase):
+    def test_rlines(self):
+        lexems = read_lines("a\n\nbc\n")
+        self.assertEqual([lexem.text for lexem in lexems], ["a", "", "bc"])
+        self.assertEqual([lexem._format_locs() for lexem in lexems], ["1:1", "", "3:1-2"])
+
+    def test_clines(self):
+        lexems = read_lines("const char * test\\\n_str = \"123\";\n")
+        self.assertEqual(len(lexems), 1)
+        self.assertEqual(lexems[0].text, "const char * test_str = \"123\";")
+        self.assertEqual(lexems[0]._format_locs(), "1:1-17;2:1-13")
+
+    def test_empty_continuations(self):
+        lexems = read_lines("a\\\n\\\n\\\nb\n")
+        self.assertEqual(len(lexems), 1)
+        self.assertEqual(lexems[0].text, "ab")
+        self.assertEqual(lexems[0]._format_locs(), "1:1;4:1")
+
+    def test_double_slashed_line(self):
+        # Only the last backslash of a raw line splices it with the next one.
+        lexems = read_lines("a\\\\\n\nb\n")
+        self.assertEqual([lexem.dump() for lexem in lexems], [
+            "Lexeme(type=LEX_CLINE, text=a\\, locs=1:1-2)",
+            "Lexeme(type=LEX_RLINE, text=b, locs=3:1)",
+        ])
+
+    def test_slashed_end(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            lexems = read_lines("a\n last\\")
+        self.assertEqual([lexem.text for lexem in lexems], ["a", " last"])
+        self.assertEqual(out.getvalue(), "Error None:2:6 Slashed end\n")
+
+    def test_parse_bulk_and_stream(self):
+        source = "a\\\n\\\nb\n\n\fc\n"
+        with tempfile.NamedTemporaryFile('w', suffix='.c', delete=False) as f:
+            f.write(source)
+        self.addCleanup(os.unlink, f.name)
+        dumps = []
+        for size in (cparser.BULK_READ_SIZE, -1):
+            out = io.StringIO()
+            with unittest.mock.patch.object(cparser, 'BULK_READ_SIZE', size):
+                with contextlib.redirect_stdout(out):
+                    CParser().parse(f.name)
+            dumps.append(out.getvalue())
+        self.assertEqual(dumps[0], dumps[1])
+        self.assertEqual(dumps[0].split('\n'), [
+            "Lexeme(type=LEX_CLINE, text=ab, locs=1:1;3:1)",
+            "Lexeme(type=LEX_RLINE, text=, locs=)",
+            "Lexeme(type=LEX_RLINE, text=\fc, locs=5:1-2)",
+            "",
+        ])
+
+    def test_slashed_empty_end(self):
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            lexems = read_lines("a\\\n\\")
+        self.assertEqual([lexem.text for lexem in lexems], ["a"])
+        self.assertEqual(lexems[0].type, cparser.LexemeType.LEX_CLINE)
+        self.assertEqual(out.getvalue(), "Error None:2:1 Slashed end\n")
+
+    def test_dump_stream_batches(self):
+        text = "".join(f"l{i}\n" for i in range(5)) + "end\\"
+        out = io.StringIO()
+        parser = CParser()
+        with unittest.mock.patch.object(cparser, 'DUMP_BATCH_SIZE', 2):
+            with contextlib.redirect_stdout(out):
+                parser.dump_stream(parser._read_lines(io.StringIO(text)))
+        lines = out.getvalue().split('\n')
+        self.assertEqual(len(lines), 8)
+        self.assertEqual(lines[4], "Lexeme(type=LEX_RLINE, text=l4, locs=5:1-2)")
+        self.assertEqual(lines[5], "Error None:6:4 Slashed end")
+        self.assertEqual(lines[6], "Lexeme(type=LEX_RLINE, text=end, locs=6:1-3)")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 import unittest
+import unittest.mock
+import utils
 from utils import format_ranges
 
 class TestFormatRanges(unittest.TestCase):
@@ -29,5 +31,27 @@ class TestFormatRanges(unittest.TestCase):
     def test_iterator(self):
         self.assertEqual(format_ranges(range(42)), "0-41")
 
+    def test_long_input(self):
+        numbers = list(range(100)) + [102] + list(range(200, 300, 2))
+        expected = "0-99, 102, " + ", ".join(str(n) for n in range(200, 300, 2))
+        self.assertEqual(format_ranges(reversed(numbers)), expected)
+
+    @unittest.skipIf(not utils.HAS_NUMPY, "numpy is not installed")
+    def test_numpy_runs_match(self):
+        numbers = sorted(set(range(0, 500, 3)) | set(range(100, 200)) | {-5, -4, 1000})
+        self.assertEqual(utils._find_runs_numpy(numbers), utils._find_runs(numbers))
+
+    @unittest.skipIf(not utils.HAS_NUMPY, "numpy is not installed")
+    def test_numpy_fallback(self):
+        self.assertIsNone(utils._find_runs_numpy([0.5 * i for i in range(20)]))
+        self.assertIsNone(utils._find_runs_numpy([2**63, 2**63 + 1]))
+        with unittest.mock.patch.object(utils, 'NUMPY_MIN_SIZE', 2):
+            self.assertEqual(format_ranges([0.5, 1.5, 3.0]), "0.5-1.5, 3.0")
+            self.assertEqual(format_ranges([2**64, 2**64 + 1]), f"{2**64}-{2**64 + 1}")
+
+    def test_very_long_input(self):
+        numbers = list(range(5000)) + list(range(5001, 6000))
+        self.assertEqual(format_ranges(numbers), "0-4999, 5001-5999")
+
 if __name__ == "__main__":
     unittest.main()